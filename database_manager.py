@@ -1,8 +1,16 @@
 import sqlite3
 import logging
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Compiled SQL reused across calls so SQLite can serve them from its
+# statement cache instead of re-parsing the text on every execution.
+_SQL_INSERT_PAGE = "INSERT OR IGNORE INTO pages (url, content, metadata) VALUES (?, ?, ?)"
+_SQL_INSERT_LINK = "INSERT OR IGNORE INTO links (url, visited) VALUES (?, ?)"
+_SQL_MARK_VISITED = "UPDATE links SET visited = 1 WHERE url = ?"
+_SQL_SET_ADJUSTED = "UPDATE pages SET adjusted_content = ? WHERE url = ?"
+
 
 class DatabaseManager:
     def __init__(self, db_path):
@@ -12,10 +20,30 @@ class DatabaseManager:
         Args:
         db_path (str): The path to the SQLite database file.
         """
-        logger.debug(f"Connecting to the database at {db_path}")
-        self.conn = sqlite3.connect(db_path)
+        logger.debug("Connecting to the database at %s", db_path)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._apply_pragmas()
         self.create_tables()
 
+    def _apply_pragmas(self):
+        """
+        Apply performance-oriented PRAGMAs to the connection.
+
+        WAL mode with relaxed synchronization avoids the two fsyncs per
+        transaction of the default rollback journal, which dominates the
+        cost of the many small writes issued during scraping.
+        """
+        logger.debug("Applying performance PRAGMAs to the database connection")
+        self.conn.executescript(
+            """PRAGMA journal_mode=WAL;
+               PRAGMA synchronous=NORMAL;
+               PRAGMA temp_store=MEMORY;
+               PRAGMA cache_size=-16000;
+               PRAGMA mmap_size=268435456;
+               PRAGMA busy_timeout=5000;
+               PRAGMA journal_size_limit=6144000;"""
+        )
+
     def create_tables(self):
         """
         Create tables 'pages' and 'links' if they do not exist in the database.
@@ -26,29 +54,61 @@ class DatabaseManager:
                 """CREATE TABLE IF NOT EXISTS pages (
                           url TEXT PRIMARY KEY,
                           content TEXT,
-                          metadata TEXT)"""
+                          metadata TEXT,
+                          adjusted_content TEXT)"""
             )
+            # Migrate caches created before the adjusted_content column existed
+            columns = {
+                row[1] for row in self.conn.execute("PRAGMA table_info(pages)")
+            }
+            if "adjusted_content" not in columns:
+                self.conn.execute(
+                    "ALTER TABLE pages ADD COLUMN adjusted_content TEXT"
+                )
             self.conn.execute(
                 """CREATE TABLE IF NOT EXISTS links (
                           url TEXT PRIMARY KEY,
-                          visited BOOLEAN)"""
+                          visited INTEGER NOT NULL DEFAULT 0)"""
+            )
+            # Partial index so polling for unvisited links scales with the
+            # queue size instead of the whole crawl history
+            self.conn.execute(
+                """CREATE INDEX IF NOT EXISTS idx_links_unvisited
+                          ON links(url) WHERE visited = 0"""
             )
 
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into a single transaction.
+
+        Callers on the hot path (e.g. the scraper marking links visited and
+        inserting pages per iteration) wrap their writes in one transaction
+        instead of paying a commit per statement.
+        """
+        with self.conn:
+            yield
+
+    def flush(self):
+        """
+        Commit any pending writes on the connection.
+        """
+        self.conn.commit()
+
     def insert_page(self, url, content, metadata):
         """
         Insert a new page into the 'pages' table.
 
+        The write is not committed here; callers batch commits via
+        transaction() or flush().
+
         Args:
         url (str): The URL of the page.
         content (str): The content of the page.
         metadata (str): The metadata of the page.
         """
-        with self.conn:
-            logger.debug(f"Inserting a new page with URL: {url}")
-            self.conn.execute(
-                "INSERT OR IGNORE INTO pages (url, content, metadata) VALUES (?, ?, ?)",
-                (url, content, metadata),
-            )
+        logger.debug("Inserting a new page with URL: %s", url)
+        self.conn.execute(_SQL_INSERT_PAGE, (url, content, metadata))
 
     def insert_link(self, url, visited=False):
         """
@@ -68,29 +128,51 @@ class DatabaseManager:
         else:
             raise ValueError("URL must be a string or a list of strings")
 
-        count = 0
         with self.conn:
-            for link in urls:
-                logger.debug(f"Inserting a new link with URL: {link}")
-                cur = self.conn.execute(
-                    "INSERT OR IGNORE INTO links (url, visited) VALUES (?, ?)",
-                    (link, visited),
+            logger.debug("Inserting %s link(s) into the database", len(urls))
+            cur = self.conn.executemany(
+                _SQL_INSERT_LINK, [(link, visited) for link in urls]
+            )
+            return cur.rowcount > 0
+
+    def insert_links_bulk(self, urls, visited=False, chunk_size=10000):
+        """
+        Insert a large batch of links, committing once per chunk.
+
+        Chunking keeps each transaction at a size where the statement
+        prepare and commit overhead is amortized across many rows.
+
+        Args:
+        urls (List[str]): The list of URLs to insert.
+        visited (bool): The status of the links (default is False).
+        chunk_size (int): Number of rows per transaction.
+
+        Returns:
+        int: The number of links actually inserted.
+        """
+        inserted = 0
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start : start + chunk_size]
+            with self.conn:
+                logger.debug("Bulk inserting %s links into the database", len(chunk))
+                cur = self.conn.executemany(
+                    _SQL_INSERT_LINK, [(link, visited) for link in chunk]
                 )
-                if cur.rowcount > 0:
-                    count += 1
-                    
-            return count > 0
+                inserted += cur.rowcount
+        return inserted
 
     def mark_link_visited(self, url):
         """
         Mark a link as visited in the 'links' table.
 
+        The write is not committed here; callers batch commits via
+        transaction() or flush().
+
         Args:
         url (str): The URL of the link to mark as visited.
         """
-        with self.conn:
-            logger.debug(f"Marking link as visited with URL: {url}")
-            self.conn.execute("UPDATE links SET visited = TRUE WHERE url = ?", (url,))
+        logger.debug("Marking link as visited with URL: %s", url)
+        self.conn.execute(_SQL_MARK_VISITED, (url,))
 
     def get_unvisited_links(self):
         """
@@ -99,10 +181,22 @@ class DatabaseManager:
         Returns:
         list: List of unvisited links.
         """
-        with self.conn:
-            logger.debug("Retrieving all unvisited links")
-            cursor = self.conn.execute("SELECT url FROM links WHERE visited = FALSE")
-            return cursor.fetchall()
+        # Materialized on purpose: the scraper updates the 'links' table
+        # while iterating the result, which is unsafe on a live cursor.
+        logger.debug("Retrieving all unvisited links")
+        cursor = self.conn.execute("SELECT url FROM links WHERE visited = 0")
+        return cursor.fetchall()
+
+    def get_all_link_urls(self):
+        """
+        Retrieve every URL in the 'links' table, visited or not.
+
+        Returns:
+        set: Set of all known link URLs.
+        """
+        logger.debug("Retrieving all known link URLs")
+        cursor = self.conn.execute("SELECT url FROM links")
+        return {row[0] for row in cursor}
 
     def get_links_count(self):
         """
@@ -126,7 +220,7 @@ class DatabaseManager:
         with self.conn:
             logger.debug("Retrieving the total number of visited links")
             cursor = self.conn.execute(
-                "SELECT COUNT(*) FROM links WHERE visited = TRUE"
+                "SELECT COUNT(*) FROM links WHERE visited = 1"
             )
             return cursor.fetchone()[0]
 
@@ -137,14 +231,79 @@ class DatabaseManager:
         Returns:
         list: List of tuples containing page URL, content, and metadata.
         """
-        with self.conn:
-            logger.debug("Retrieving all pages")
-            cursor = self.conn.execute("SELECT url, content, metadata FROM pages")
-            return cursor.fetchall()
+        logger.debug("Retrieving all pages")
+        return list(self.iter_all_pages())
+
+    def iter_all_pages(self, batch=1000):
+        """
+        Stream all pages from the 'pages' table in fetchmany batches.
+
+        Streaming avoids materializing every content blob in RAM at once,
+        which matters for large crawls where the exporters only need one
+        page at a time; fetching in batches amortizes the per-row cursor
+        call overhead.
+
+        Args:
+        batch (int): Number of rows fetched from the cursor at a time.
 
-    def __del__(self):
+        Yields:
+        tuple: Page URL, content, and metadata.
         """
-        Close the database connection when the object is deleted.
+        logger.debug("Streaming all pages")
+        cursor = self.conn.execute("SELECT url, content, metadata FROM pages")
+        while rows := cursor.fetchmany(batch):
+            yield from rows
+
+    def iter_non_empty_pages(self, batch=1000):
+        """
+        Stream pages whose content is not NULL from the 'pages' table.
+
+        Pushing the filter into SQL spares the exporters from fetching and
+        skipping empty rows in Python.
+
+        Args:
+        batch (int): Number of rows fetched from the cursor at a time.
+
+        Yields:
+        tuple: Page URL, content, and metadata.
+        """
+        logger.debug("Streaming non-empty pages")
+        cursor = self.conn.execute(
+            """SELECT url, content, metadata, adjusted_content
+                  FROM pages WHERE content IS NOT NULL"""
+        )
+        while rows := cursor.fetchmany(batch):
+            yield from rows
+
+    def set_adjusted_content(self, url, adjusted_content):
+        """
+        Cache the header-adjusted content for a page.
+
+        The write is not committed here; callers batch commits via
+        transaction() or flush().
+
+        Args:
+        url (str): The URL of the page.
+        adjusted_content (str): The header-adjusted Markdown content.
+        """
+        logger.debug("Caching adjusted content for URL: %s", url)
+        self.conn.execute(_SQL_SET_ADJUSTED, (adjusted_content, url))
+
+    def close(self):
+        """
+        Checkpoint the WAL and close the database connection.
+
+        Explicit closing is deterministic (unlike __del__) and truncates the
+        -wal file so it does not grow without bound between runs.
         """
         logger.debug("Closing the database connection")
-        self.conn.close()
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
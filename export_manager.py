@@ -1,9 +1,36 @@
-import json
+import orjson
+import re
+from concurrent.futures import ThreadPoolExecutor
 from database_manager import DatabaseManager
 import log_setup
 import os
 from tqdm import tqdm
 
+# Collapse runs of three or more newlines down to exactly two
+_NEWLINE_RE = re.compile(r"\n{3,}")
+
+# 1 MiB write buffer: far fewer write syscalls than the default 8 KiB
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Match an ATX header line, capturing the leading hashes and the rest
+_HEADER_RE = re.compile(r"^(#{1,6})(.*)$", re.MULTILINE)
+
+# Hash runs clamped at six, indexed by (matched hashes + increment); the
+# lookup replaces both the min() clamp and a string multiplication per header
+_HASH_RUNS = tuple("#" * min(n, 6) for n in range(13))
+
+# Direct run-to-run mapping for the increment-by-one case, which is the
+# only increment the exporters actually use
+_BUMP_ONE = {"#" * n: "#" * min(n + 1, 6) for n in range(1, 7)}
+
+
+def _bump_header_by_one(match):
+    """
+    Replacement function for _HEADER_RE hard-coded to a +1 increment.
+    """
+    # Surround headers with newlines so they stay separated after concatenation
+    return "\n" + _BUMP_ONE[match.group(1)] + match.group(2) + "\n"
+
 logger = log_setup.get_logger()
 logger.name = "export_manager"
 
@@ -17,8 +44,31 @@ class ExportManager:
         """
         self.db_manager = db_manager
         self.title = title
+        self._pages = None
         logger.info("ExportManager initialized.")  # Add log message
 
+    def _load_pages(self):
+        """
+        Load non-empty pages once, with metadata parsed and null values stripped.
+
+        The result is memoized so the markdown, JSON and individual exports
+        share a single table scan and a single metadata parse per page.
+
+        Returns:
+        list: List of (url, content, metadata dict, adjusted content) tuples.
+        """
+        if self._pages is None:
+            self._pages = [
+                (
+                    url,
+                    content,
+                    {k: v for k, v in orjson.loads(metadata).items() if v is not None},
+                    adjusted_content,
+                )
+                for url, content, metadata, adjusted_content in self.db_manager.iter_non_empty_pages()
+            ]
+        return self._pages
+
     def _adjust_headers(self, content, level_increment=1):
         """
         Adjust the header levels in the Markdown content.
@@ -31,14 +81,19 @@ class ExportManager:
         Returns:
         str: The adjusted Markdown content.
         """
-        new_content = ""
-        for line in content.split("\n"):
-            if line.startswith("#"):
-                hashes = len(line.split(" ")[0])
-                new_hashes = min(hashes + level_increment, 6)  # Limit to ######
-                line = "\n" + "#" * new_hashes + line[hashes:] + "\n"
-            new_content += line + "\n"
-        return new_content
+        # Dispatch the default increment to the specialized module-level
+        # replacement, skipping the closure and the index arithmetic
+        if level_increment == 1:
+            return _HEADER_RE.sub(_bump_header_by_one, content) + "\n"
+
+        # Clamp once per call so the per-header table lookup cannot overrun
+        level_increment = min(level_increment, 6)
+
+        def bump(match):
+            # Surround headers with newlines so they stay separated after concatenation
+            return "\n" + _HASH_RUNS[len(match.group(1)) + level_increment] + match.group(2) + "\n"
+
+        return _HEADER_RE.sub(bump, content) + "\n"
 
     def _cleanup_markdown(self, content):
         """
@@ -54,10 +109,40 @@ class ExportManager:
         Returns:
             str: The cleaned-up Markdown content with reduced newline characters.
         """
-        while "\n\n\n" in content:
-            content = content.replace("\n\n\n", "\n\n")
-        return content
+        return _NEWLINE_RE.sub("\n\n", content)
+
+
+    def _iter_markdown_chunks(self, pages):
+        """
+        Yield the concatenated Markdown document one page chunk at a time.
 
+        Each chunk is cleaned up independently, which is safe because chunk
+        boundaries never produce more than two consecutive newlines. Streaming
+        chunks keeps peak memory at one page instead of the whole corpus.
+
+        Args:
+        pages (iterable): Pages to concatenate.
+
+        Yields:
+        str: The next chunk of the Markdown document.
+        """
+        yield f"# {self.title}\n"
+        for url, content, metadata, adjusted_content in pages:
+            # Prepare metadata as an HTML comment, built with a single join
+            lines = [f"URL: {url}"]
+            lines.extend(f"{key}: {value}" for key, value in metadata.items())
+            metadata_content = "<!--\n" + "\n".join(lines) + "\n-->"
+
+            # Adjust headers for subsequent files, reusing the cached result
+            # from an earlier export of the same database when available
+            if adjusted_content is None:
+                adjusted_content = self._adjust_headers(content)
+                self.db_manager.set_adjusted_content(url, adjusted_content)
+
+            # Add a separator and metadata
+            yield self._cleanup_markdown(
+                "\n" + metadata_content + "\n\n" + adjusted_content + "\n---"
+            )
 
     def _concatenate_markdown(self, pages):
         """
@@ -69,32 +154,7 @@ class ExportManager:
         Returns:
         str: The concatenated Markdown content.
         """
-        final_content = f"# {self.title}\n"
-        for url, content, metadata in pages:
-            if content is None:
-                continue  # Skip empty pages
-
-            filtered_metadata = {
-                k: v for k, v in json.loads(metadata).items() if v is not None
-            }
-
-            # Prepare metadata as an HTML comment
-            metadata_content = "<!--\n"
-            metadata_content += f"URL: {url}\n"
-            for key, value in filtered_metadata.items():
-                metadata_content += f"{key}: {value}\n"
-            metadata_content += "-->"
-
-            # Adjust headers for subsequent files and add metadata
-            adjusted_content = self._adjust_headers(content)
-
-            final_content += (
-                "\n" + metadata_content + "\n\n" + adjusted_content + "\n---"
-            )  # Add a separator and metadata
-            
-            final_content = self._cleanup_markdown(final_content)
-
-        return final_content
+        return "".join(self._iter_markdown_chunks(pages))
 
     def export_to_markdown(self, output_path):
         """
@@ -103,11 +163,17 @@ class ExportManager:
         Args:
         output_path (str): The path to the output markdown file.
         """
-        pages = self.db_manager.get_all_pages()
-        with open(output_path, "w", encoding="utf-8") as md_file:
-            md_file.write(self._concatenate_markdown(pages))
+        pages = self._load_pages()
+        # Binary mode skips TextIOWrapper's incremental encoder; each chunk
+        # is encoded once with the C-level str.encode instead
+        with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as md_file:
+            md_file.writelines(
+                chunk.encode("utf-8") for chunk in self._iter_markdown_chunks(pages)
+            )
+        # Persist any adjusted-content cache entries written during the export
+        self.db_manager.flush()
         logger.info(
-            f"Exported pages to markdown file: {output_path}"
+            "Exported pages to markdown file: %s", output_path
         )  # Add log message
 
     def export_to_json(self, output_path):
@@ -117,25 +183,23 @@ class ExportManager:
         Args:
         output_path (str): The path to the output JSON file.
         """
-        pages = self.db_manager.get_all_pages()
-        with open(output_path, "w", encoding="utf-8") as json_file:
-            # Filter metadata and strip null values
-            data_to_export = []
-            for url, content, metadata in pages:
-                if content is None:
-                    continue  # Skip empty pages
-
+        pages = self._load_pages()
+        with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as json_file:
+            # Write one page at a time instead of materializing the full list
+            json_file.write(b"[\n")
+            first = True
+            for url, content, metadata, _ in pages:
                 content = self._cleanup_markdown(content)
-
-                filtered_metadata = {
-                    k: v for k, v in json.loads(metadata).items() if v is not None
-                }
-                data_to_export.append(
-                    {"url": url, "content": content, "metadata": filtered_metadata}
+                entry = {"url": url, "content": content, "metadata": metadata}
+                if not first:
+                    json_file.write(b",\n")
+                json_file.write(
+                    orjson.dumps(entry, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
                 )
-            json.dump(data_to_export, json_file, ensure_ascii=False, indent=4)
+                first = False
+            json_file.write(b"\n]")
             # Log the successful export to JSON file
-            logger.info(f"Exported pages to JSON file: {output_path}")
+            logger.info("Exported pages to JSON file: %s", output_path)
 
     def export_individual_markdown(self, output_folder, base_url=None):
         """
@@ -145,32 +209,55 @@ class ExportManager:
         output_folder (str): The base output folder where the files will be saved.
         base_url (str or None): Base URL to remove for creating the path.
         """
-        pages = self.db_manager.get_all_pages()
+        pages = self._load_pages()
         # Add 'files/' to the output folder and create it if it doesn't exist
         output_folder = os.path.join(output_folder, "files")
         
         os.makedirs(output_folder, exist_ok=True)
+        # Remember directories already created so each one costs a single syscall
+        created_dirs = {output_folder}
+        # Compute paths and create directories serially, collecting the writes
+        files_to_write = []
         for page in pages:
-            url, content, metadata = page
-            logger.debug(f"Exporting individual Markdown for URL: {url}")
+            url, content, metadata, _ = page
+            logger.debug("Exporting individual Markdown for URL: %s", url)
 
             # Remove base_url from parsed URL if provided
             if base_url:
                 url = url.replace(base_url, "")
 
             # Parse the URL to determine the folder and filename
-            parsed_url = url.replace("https://", "").replace("http://", "")
+            parsed_url = url.removeprefix("https://").removeprefix("http://")
             if parsed_url.endswith("/") or parsed_url == "":
                 file_path = os.path.join(output_folder, parsed_url, "index.md")
             else:
                 file_path = os.path.join(output_folder, parsed_url + ".md")
 
             # Ensure directories exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            dirname = os.path.dirname(file_path)
+            if dirname not in created_dirs:
+                os.makedirs(dirname, exist_ok=True)
+                created_dirs.add(dirname)
 
-            # Write the Markdown content
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write(content)
-                logger.debug(f"Markdown exported to {file_path}")
+            files_to_write.append((file_path, content))
+
+        # Overlap the many small open/write/close syscalls across threads
+        with ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 4) * 4)
+        ) as executor:
+            list(executor.map(self._write_markdown_file, files_to_write))
 
         return output_folder
+
+    @staticmethod
+    def _write_markdown_file(path_and_content):
+        """
+        Write a single Markdown file; helper for the threaded export.
+
+        Args:
+        path_and_content (tuple): The (file path, content) pair to write.
+        """
+        file_path, content = path_and_content
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        logger.debug("Markdown exported to %s", file_path)
@@ -1,5 +1,7 @@
 # log_config.py
+import atexit
 import logging
+import logging.handlers
 from logging import Logger
 from math import exp
 import coloredlogs
@@ -7,6 +9,16 @@ from tqdm import tqdm
 
 logger = Logger("tmp")
 
+# Built once at import time; ColoredFormatter probes the terminal's ANSI
+# capabilities, which is not worth repeating on every setup_logging call.
+# Updated to show the filename and line number instead of hostname
+_FORMATTER = coloredlogs.ColoredFormatter(
+    "%(asctime)s %(filename)s:%(lineno)d %(name)s[%(process)d] %(levelname)s %(message)s"
+)
+
+# Tracks whether the handler chain has already been installed
+_INSTALLED = False
+
 class TqdmHandler(logging.StreamHandler):
     """
     Custom logging handler utilizing tqdm for progress bar support in logging.
@@ -22,6 +34,10 @@ class TqdmHandler(logging.StreamHandler):
         Args:
             record (logging.LogRecord): The log record to be emitted.
         """
+        # Skip formatting entirely for records below the handler's level;
+        # ColoredFormatter is expensive and the record would be dropped anyway
+        if record.levelno < self.level:
+            return
         try:
             # Format the log message
             msg = self.format(record)
@@ -41,21 +57,36 @@ def setup_logging(log_level: str = "WARN"):
     Args:
         log_level (str, optional): The minimum log level for messages to be handled. Defaults to "WARN".
     """
-    global logger
-    
+    global logger, _INSTALLED
+
     # Get the root logger
     logger = logging.getLogger()
+    # On repeat calls the handler chain already exists; just move the levels
+    if _INSTALLED:
+        logger.setLevel(log_level)
+        for existing in logger.handlers:
+            existing.setLevel(log_level)
+            # Buffering handlers filter again at their target; keep it in sync
+            target = getattr(existing, "target", None)
+            if target is not None:
+                target.setLevel(log_level)
+        return
+    _INSTALLED = True
     # Create an instance of the custom TqdmHandler
     handler = TqdmHandler()
-    # Define a formatter with a specific format string, including colored output
-    # Updated to show the filename and line number instead of hostname
-    formatter = coloredlogs.ColoredFormatter(
-        "%(asctime)s %(filename)s:%(lineno)d %(name)s[%(process)d] %(levelname)s %(message)s"
+    # Set the cached formatter for the handler
+    handler.setFormatter(_FORMATTER)
+    # Filter at the handler too so emit can short-circuit cheaply
+    handler.setLevel(log_level)
+    # Buffer routine records and hand them to tqdm.write in batches of 64;
+    # warnings and errors flush the buffer immediately so they show up on
+    # time, and the atexit hook drains whatever is left at shutdown
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=64, flushLevel=logging.WARNING, target=handler
     )
-    # Set the formatter for the handler
-    handler.setFormatter(formatter)
-    # Add the custom handler to the logger
-    logger.addHandler(handler)
+    atexit.register(memory_handler.flush)
+    # Add the buffering handler to the logger
+    logger.addHandler(memory_handler)
     # Set the logger's level to the specified log level
     logger.setLevel(log_level)
     # Install coloredlogs with the specified log level and logger
@@ -1,4 +1,3 @@
-from turtle import title
 import log_setup
 import os
 import argparse
@@ -9,22 +8,19 @@ import sys
 log_level = os.getenv("LOG_LEVEL", "WARN")
 log_setup.setup_logging(log_level)
 
-from database_manager import DatabaseManager
-from export_manager import ExportManager
-from scraper import Scraper
-
 logger = log_setup.get_logger()
 logger.name = "main"
 
 
-def main():
+def build_parser():
     """
-    Main function to start the web scraper application.
+    Build the command line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The configured parser.
     """
-    logger.info("Starting the web scraper application.")
-    
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description="Web Scraper to Markdown")
+    # allow_abbrev=False skips argparse's prefix-matching pass over options
+    parser = argparse.ArgumentParser(description="Web Scraper to Markdown", allow_abbrev=False)
     parser.add_argument("--url", "-u", help="Base URL to start scraping")
     parser.add_argument("--urls-file", help="Path to a file containing URLs to scrape, one URL per line. If '-', read from stdin.")
     parser.add_argument("--output-folder", "-o", help="Output folder for the markdown file", default="./output")
@@ -35,26 +31,37 @@ def main():
     parser.add_argument("--export-individual", "-ei", action="store_true", help="Export each page as an individual Markdown file", default=False)
     parser.add_argument("--rate-limit", "-rl", type=int, help="Maximum number of requests per minute", default=0)
     parser.add_argument("--delay", "-d", type=float, help="Delay between requests in seconds", default=0)
+    parser.add_argument("--workers", "-w", type=int, help="Number of concurrent fetch threads", default=8)
 
     try:
         import argcomplete
         argcomplete.autocomplete(parser)
     except ImportError:
         pass
-    
-    args = parser.parse_args()
-    logger.debug(f"Command line arguments parsed: {args}")
+
+    return parser
+
+
+def main():
+    """
+    Main function to start the web scraper application.
+    """
+    logger.info("Starting the web scraper application.")
+
+    # Parse command line arguments
+    args = build_parser().parse_args()
+    logger.debug("Command line arguments parsed: %s", args)
 
     # Read URLs from a file or stdin
     if args.urls_file:
+        # Strip, drop blanks and deduplicate in a single pass over the input
         if args.urls_file == "-":
             print("Enter URLs, one per line (Ctrl-D to finish):")
-            urls_list = [line.strip() for line in sys.stdin]
+            urls_list = list(dict.fromkeys(filter(None, (line.strip() for line in sys.stdin))))
         else:
             with open(args.urls_file, "r") as file:
-                urls_list = [line.strip() for line in file.readlines()]
-                
-        urls_list = utils.deduplicate_list(urls_list)
+                urls_list = list(dict.fromkeys(filter(None, (line.strip() for line in file))))
+
         args.url = None  # Ensure args.url is defined even if not used
     else:
         urls_list = []
@@ -62,57 +69,61 @@ def main():
     if not args.url and not urls_list:
         raise ValueError("No URL provided. Please provide either --url or --urls-file.")
 
-    output = os.path.join(args.output_folder, utils.url_to_filename(args.url) if args.url else utils.url_to_filename(urls_list[0]))
-    
-    # Create the output folder if it does not exist
-    if not os.path.exists(output):
-        logger.info(f"Creating output folder at {output}")
+    # Import the heavy modules only once the arguments are known to be valid,
+    # keeping --help and argument errors fast
+    from database_manager import DatabaseManager
+    from export_manager import ExportManager
+    from scraper import Scraper
+
+    # Derive the filename from the first URL once and reuse it everywhere
+    first_url = args.url if args.url else urls_list[0]
+    first_filename = utils.url_to_filename(first_url)
 
-        os.makedirs(output)
+    output = os.path.join(args.output_folder, first_filename)
 
-    # Create the cache folder if it does not exist
-    if not os.path.exists(args.cache_folder):
-        logger.info(f"Creating cache folder at {args.cache_folder}")
-        os.makedirs(args.cache_folder)
+    # Create the output and cache folders if they do not exist
+    os.makedirs(output, exist_ok=True)
+    os.makedirs(args.cache_folder, exist_ok=True)
 
     # If no base url, set it to the url base
     if not args.base_url:
         if not args.urls_file:
-            args.base_url = utils.url_dirname(args.url if args.url else urls_list[0])
-        logger.debug(f"No base URL provided. Setting base URL to {args.base_url}")
+            args.base_url = utils.url_dirname(first_url)
+        logger.debug("No base URL provided. Setting base URL to %s", args.base_url)
 
     # If no title, set it to the url base
     if not args.title:
-        args.title = args.url if args.url else urls_list[0]
-        logger.debug(f"No title provided. Setting title to {args.title}")
+        args.title = first_url
+        logger.debug("No title provided. Setting title to %s", args.title)
 
-    # Initialize managers
-    db_manager = DatabaseManager(os.path.join(args.cache_folder, utils.url_to_filename(args.url if args.url else urls_list[0]) + ".sqlite"))
-    logger.info("DatabaseManager initialized.")
+    # Initialize managers; the context manager guarantees the database is
+    # checkpointed and closed even if scraping or exporting fails.
+    with DatabaseManager(os.path.join(args.cache_folder, first_filename + ".sqlite")) as db_manager:
+        logger.info("DatabaseManager initialized.")
 
-    scraper = Scraper(base_url=args.base_url, exclude_patterns=args.exclude, db_manager=db_manager, rate_limit=args.rate_limit, delay=args.delay)
-    logger.info("Scraper initialized.")
+        scraper = Scraper(base_url=args.base_url, exclude_patterns=args.exclude, db_manager=db_manager, rate_limit=args.rate_limit, delay=args.delay, workers=args.workers)
+        logger.info("Scraper initialized.")
 
-    # Start the scraping process
-    logger.info(f"Starting the scraping process for URL: {args.url}")
-    scraper.start_scraping(url=args.url, urls_list=urls_list)
+        # Start the scraping process
+        logger.info("Starting the scraping process for URL: %s", args.url)
+        scraper.start_scraping(url=args.url, urls_list=urls_list)
 
-    output_name = utils.randomstring_to_filename(args.title)
+        output_name = utils.randomstring_to_filename(args.title)
 
-    # After the scraping process is completed in the main function
-    export_manager = ExportManager(db_manager, args.title)
-    logger.info("ExportManager initialized.")
-    
-    export_manager.export_to_markdown(os.path.join(output, f"{output_name}.md"))
-    logger.info("Export to markdown completed.")
-    
-    export_manager.export_to_json(os.path.join(output, f"{output_name}.json"))
-    logger.info("Export to JSON completed.")
-    
-    if args.export_individual:
-        logger.info("Export of individual pages...")
-        output_folder_ei = export_manager.export_individual_markdown(output_folder=output, base_url=args.base_url if args.base_url else None)
-        logger.info("Export of individual Markdown files completed.")
+        # After the scraping process is completed in the main function
+        export_manager = ExportManager(db_manager, args.title)
+        logger.info("ExportManager initialized.")
+
+        export_manager.export_to_markdown(os.path.join(output, f"{output_name}.md"))
+        logger.info("Export to markdown completed.")
+
+        export_manager.export_to_json(os.path.join(output, f"{output_name}.json"))
+        logger.info("Export to JSON completed.")
+
+        if args.export_individual:
+            logger.info("Export of individual pages...")
+            output_folder_ei = export_manager.export_individual_markdown(output_folder=output, base_url=args.base_url if args.base_url else None)
+            logger.info("Export of individual Markdown files completed.")
     
     markdown_path = os.path.join(output, f"{output_name}.md")
     json_path = os.path.join(output, f"{output_name}.json")
@@ -1,9 +1,15 @@
-from curses import meta
+import logging
+import re
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urldefrag
 import log_setup
 import trafilatura
+from trafilatura.settings import Extractor
 import mdformat
 import json
 from database_manager import DatabaseManager
@@ -16,8 +22,35 @@ logger = log_setup.get_logger()
 logger.name = "Scraper"
 
 
+class _AHrefCollector:
+    """
+    lxml parser target that records anchor hrefs without building a tree.
+
+    Only the href strings survive parsing, so memory stays O(anchors)
+    instead of O(document) and no Element objects are created.
+    """
+
+    def __init__(self):
+        self.hrefs = []
+
+    def start(self, tag, attrib):
+        if tag == "a":
+            href = attrib.get("href")
+            if href:
+                self.hrefs.append(href)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.hrefs
+
+
 class Scraper:
-    def __init__(self, base_url, exclude_patterns, db_manager: DatabaseManager, rate_limit=0, delay=0):
+    def __init__(self, base_url, exclude_patterns, db_manager: DatabaseManager, rate_limit=0, delay=0, workers=8):
         """
         Initialize the Scraper object with base URL, exclude patterns, and database manager.
         Log the initialization process.
@@ -28,13 +61,43 @@ class Scraper:
         db_manager (DatabaseManager): The database manager object for storing scraped data.
         rate_limit (int): Maximum number of requests per minute.
         delay (float): Delay between requests in seconds.
+        workers (int): Number of concurrent fetch threads.
         """
-        logger.debug(f"Initializing Scraper with base URL: {base_url}")
+        logger.debug("Initializing Scraper with base URL: %s", base_url)
         self.base_url = base_url
         self.exclude_patterns = exclude_patterns or []
+        # One C-level scan over an alternation beats N substring checks per link
+        self._exclude_re = (
+            re.compile("|".join(map(re.escape, self.exclude_patterns)))
+            if self.exclude_patterns
+            else None
+        )
         self.db_manager = db_manager
         self.rate_limit = rate_limit
         self.delay = delay
+        self.workers = workers
+        # One session shared by all fetch threads for keep-alive pooling.
+        # The adapter pool is sized for the concurrent fetchers and retries
+        # transient server errors with exponential backoff.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Build the extraction options once and reuse them for every page
+        self._extract_options = Extractor(
+            output_format="markdown",
+            formatting=True,
+            links=True,
+            tables=True,
+        )
 
     def is_valid_link(self, link):
         """
@@ -50,13 +113,15 @@ class Scraper:
         valid = True
         if self.base_url and not link.startswith(self.base_url):
             valid = False
-        for pattern in self.exclude_patterns:
-            if pattern in link:
-                valid = False
-        logger.debug(f"Link validation for {link}: {valid}")
+        elif self._exclude_re and self._exclude_re.search(link):
+            valid = False
+        # This runs once per discovered href; skip even the logging call
+        # machinery unless debug output is actually wanted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Link validation for %s: %s", link, valid)
         return valid
 
-    def fetch_links(self, url, html=None):
+    def fetch_links(self, url, html=None, tree=None):
         """
         Fetch all valid links from the given URL.
         Log the fetching process and outcome.
@@ -64,18 +129,25 @@ class Scraper:
         Args:
         url (str): The URL to fetch links from.
         html (str, optional): The HTML content of the page.
+        tree (lxml.html.HtmlElement, optional): An already-parsed document
+            tree; when given, no parsing happens here at all.
 
         Returns:
         set: Set of valid links found on the page.
         """
-        logger.debug(f"Fetching links from {url}")
+        logger.debug("Fetching links from %s", url)
         try:
-            if not html:
+            if tree is not None:
+                # Reuse the shared tree; iter('a') is a C-level traversal
+                raw_hrefs = [
+                    href for a in tree.iter("a") if (href := a.get("href"))
+                ]
+            elif not html:
                 # Send a GET request to the URL
                 response = requests.get(url)
                 if response.status_code != 200:
                     logger.warning(
-                        f"Failed to fetch {url} with status code {response.status_code}"
+                        "Failed to fetch %s with status code %s", url, response.status_code
                     )
                     return []
                 else:
@@ -83,21 +155,23 @@ class Scraper:
             else:
                 content = html
 
-            # Parse the content using BeautifulSoup
-            soup = BeautifulSoup(content, "html.parser")
-            # Extract all anchor tags and join the URLs
-            links = [urljoin(url, a.get("href")) for a in soup.find_all("a", href=True)]
-            # Remove fragments and filter valid links
-            links = [
-                urldefrag(link)[0]
-                for link in links
-                if self.is_valid_link(urldefrag(link)[0])
-            ]
+            if tree is None:
+                # Stream-parse with a target collector; no DOM is materialized
+                parser = etree.HTMLParser(target=_AHrefCollector())
+                if isinstance(content, str):
+                    content = content.encode("utf-8")
+                parser.feed(content)
+                raw_hrefs = parser.close()
+            # Resolve each href against the page URL
+            hrefs = (urljoin(url, href) for href in raw_hrefs)
+            # Remove fragments once per link and filter valid links
+            defragged = (urldefrag(href)[0] for href in hrefs)
+            links = {link for link in defragged if self.is_valid_link(link)}
             # Log the number of valid links found
-            logger.debug(f"Found {len(links)} valid links on {url}")
-            return set(links)
+            logger.debug("Found %s valid links on %s", len(links), url)
+            return links
         except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {e}")
+            logger.error("Error fetching %s: %s", url, e)
             return []
 
     def scrape_page(self, html, url):
@@ -106,13 +180,15 @@ class Scraper:
         Log the scraping process and outcome.
 
         Args:
-        html (str): The HTML content of the page.
+        html (str | bytes | lxml.html.HtmlElement): The HTML content of the
+            page, or an already-parsed tree (trafilatura accepts both; a
+            tree skips re-parsing the document for each extraction).
         url (str): The URL to scrape.
 
         Returns:
         tuple: A tuple containing the extracted content and metadata of the page.
         """
-        logger.info(f"Scraping page {url}")
+        logger.info("Scraping page %s", url)
 
         try:
             metadata = trafilatura.metadata.extract_metadata(filecontent=html, default_url=url).as_dict()
@@ -122,40 +198,38 @@ class Scraper:
             if "commentsbody" in metadata:
                 metadata.pop("commentsbody")
             
-            markdown = (
-                trafilatura.extract(
-                    html,
-                    output_format="markdown",
-                    include_formatting=True,
-                    include_links=True,
-                    include_tables=True,
-                )
-                or ""
-            )
+            markdown = trafilatura.extract(html, options=self._extract_options) or ""
 
-            logger.debug(f"Successfully scraped content and metadata from {url}")
+            logger.debug("Successfully scraped content and metadata from %s", url)
             return markdown, metadata
 
         except Exception as e:
-            logger.error(f"Error scraping {url}: {e}")
+            logger.error("Error scraping %s: %s", url, e)
             return None, None
 
-    def start_scraping(self, url=None, urls_list=[]):
+    def start_scraping(self, url=None, urls_list=None):
         """
         Initiates the scraping process for a single URL or a list of URLs. It validates URLs,
         logs the scraping process, and manages the progress of scraping through the database.
 
         Args:
             url (str, optional): A single URL to start scraping from. Defaults to None.
-            urls_list (list, optional): A list of URLs to scrape. Defaults to an empty list.
+            urls_list (list, optional): A list of URLs to scrape. Defaults to None.
         """
+        # Normalize the mutable default away
+        urls_list = urls_list or []
+
         # Validate and insert the provided URLs into the database
         if urls_list:
-            # Iterate through the list to check for valid URLs
-            for url in urls_list:
-                if not self.is_valid_link(url):
-                    logger.warning(f"Skipping invalid URL: {url}")
-                    urls_list.remove(url)  # Remove invalid URLs from the list
+            # Partition the list in one pass; removing during iteration both
+            # skipped entries and cost O(N) per removal
+            valid_urls = []
+            for seed_url in urls_list:
+                if self.is_valid_link(seed_url):
+                    valid_urls.append(seed_url)
+                else:
+                    logger.warning("Skipping invalid URL: %s", seed_url)
+            urls_list = valid_urls
 
             # Insert the validated list of URLs into the database
             self.db_manager.insert_link(urls_list)
@@ -175,86 +249,171 @@ class Scraper:
         )
 
         # Initialize rate limit tracking variables
-        request_count = 0
-        start_time = time.time()
-
-        # Begin the scraping loop
-        while True:
-            # Fetch a list of unvisited links from the database
-            unvisited_links = self.db_manager.get_unvisited_links()
-
-            # Exit the loop if there are no more links to visit
-            if not unvisited_links:
-                logger.info("No more links to visit. Exiting.")
-                break
-
-            # Process each unvisited link
-            for link in unvisited_links:
-                # Check rate limit
-                if self.rate_limit > 0:
-                    current_time = time.time()
-                    elapsed_time = current_time - start_time
-                    if request_count >= self.rate_limit:
-                        sleep_time = 60 - elapsed_time
-                        if sleep_time > 0:
-                            logger.debug(f"Rate limit reached, sleeping for {sleep_time} seconds")
-                            time.sleep(sleep_time)
-                        # Reset the rate limit tracker
-                        request_count = 0
-                        start_time = time.time()
-
-                # Wait for the specified self.delay before making the next request
-                if self.delay > 0:
-                    logger.debug(f"self.delaying for {self.delay} seconds before next request")
-                    time.sleep(self.delay)
-
-                pbar.update(1)  # Update the progress bar
-                url = link[0]  # Extract the URL from the link tuple
-
-                # Attempt to fetch the page content
-                response = requests.get(url)
-
-                # Increment request count for rate limiting
-                request_count += 1
-
-                # Check for a successful response and correct content type
-                if response.status_code != 200 or not response.headers.get(
-                    "content-type", ""
-                ).startswith("text/html"):
-                    # Mark the link as visited and log the reason for skipping
-                    self.db_manager.mark_link_visited(url)
-                    logger.info(
-                        f"Skipping link {url} due to invalid status code or content type"
+        self._request_count = 0
+        self._rate_window_start = time.time()
+
+        # Seed the in-memory work queue once; newly discovered links are
+        # pushed straight onto it so the loop runs without re-querying the
+        # database on every iteration
+        pending = deque(row[0] for row in self.db_manager.get_unvisited_links())
+        known_urls = self.db_manager.get_all_link_urls()
+
+        # Begin the scraping loop with a shared pool of fetch threads
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                if not pending:
+                    # Recovery fallback: trust the database over the queue
+                    pending.extend(
+                        row[0] for row in self.db_manager.get_unvisited_links()
+                    )
+                    if not pending:
+                        logger.info("No more links to visit. Exiting.")
+                        break
+
+                # Drain the queue into one batch; discoveries made while
+                # processing are appended for the next iteration
+                batch = list(pending)
+                pending.clear()
+
+                # Process the whole batch under one transaction so the per-page
+                # writes share a single commit instead of one fsync each
+                with self.db_manager.transaction():
+                    self._process_links(
+                        batch, pbar, urls_list, executor, pending, known_urls
                     )
-                    continue
 
-                # Extract the HTML content from the response
-                html = response.content
+        # Close the progress bar upon completion of the scraping process
+        pbar.close()
 
-                # Scrape the page for content and metadata
-                content, metadata = self.scrape_page(html, url)
+    def _fetch(self, url):
+        """
+        Fetch a single URL; worker function for the fetch threads.
 
-                # Insert the scraped data into the database
-                self.db_manager.insert_page(url, content, json.dumps(metadata))
+        Args:
+            url (str): The URL to fetch.
 
-                # Fetch and insert new links found on the page, if not working from a predefined list
-                if not urls_list:
-                    new_links = self.fetch_links(html=html, url=url)
+        Returns:
+            requests.Response or None: The response, or None on request failure.
+            The body is only downloaded for successful text/html responses.
+        """
+        try:
+            response = self.session.get(url, stream=True)
+            if response.status_code == 200 and response.headers.get(
+                "content-type", ""
+            ).startswith("text/html"):
+                # Pull the body here so the download happens on this worker
+                response.content
+            else:
+                # Skip the transfer entirely for non-HTML or failed responses
+                response.close()
+            return response
+        except requests.RequestException as e:
+            logger.error("Error fetching %s: %s", url, e)
+            return None
 
-                    # Count and insert new links into the database
-                    real_new_links_count = 0
-                    for new_url in new_links:
-                        if self.db_manager.insert_link(new_url):
-                            real_new_links_count += 1
-                            logger.debug(f"Inserted new link {new_url} into the database")
+    def _throttle(self):
+        """
+        Apply the configured rate limit and inter-request delay.
 
-                    # Update the progress bar total with the count of new links
-                    if real_new_links_count:
-                        pbar.total += real_new_links_count
-                        pbar.refresh()
+        Called from the main thread before each fetch is submitted, so the
+        request issuance rate is governed globally regardless of how many
+        worker threads are in flight.
+        """
+        if self.rate_limit > 0:
+            elapsed_time = time.time() - self._rate_window_start
+            if self._request_count >= self.rate_limit:
+                sleep_time = 60 - elapsed_time
+                if sleep_time > 0:
+                    logger.debug("Rate limit reached, sleeping for %s seconds", sleep_time)
+                    time.sleep(sleep_time)
+                # Reset the rate limit tracker
+                self._request_count = 0
+                self._rate_window_start = time.time()
+
+        # Wait for the specified delay before making the next request
+        if self.delay > 0:
+            logger.debug("Delaying for %s seconds before next request", self.delay)
+            time.sleep(self.delay)
+
+    def _process_links(self, batch, pbar, urls_list, executor, pending, known_urls):
+        """
+        Fetch a batch of links concurrently, then scrape and store the results.
+
+        Fetches overlap network latency across the worker threads while
+        parsing and database writes stay on the calling thread, keeping
+        SQLite single-writer.
+
+        Args:
+            batch (list): Batch of URLs to process.
+            pbar (tqdm): Progress bar to update as links complete.
+            urls_list (list): Original seed list; when non-empty, link
+                discovery is skipped.
+            executor (ThreadPoolExecutor): Pool used for the fetches.
+            pending (deque): Work queue to extend with discovered links.
+            known_urls (set): Every URL already queued or visited.
+        """
+        # Submit all fetches, throttling issuance on the main thread; hoist
+        # the throttle check so unthrottled crawls skip the call entirely
+        throttled = self.rate_limit > 0 or self.delay > 0
+        futures = {}
+        for fetch_url in batch:
+            if throttled:
+                self._throttle()
+            futures[executor.submit(self._fetch, fetch_url)] = fetch_url
+
+            # Increment request count for rate limiting
+            self._request_count += 1
+
+        # Consume results as the fetches complete
+        for future in as_completed(futures):
+            url = futures[future]
+            pbar.update(1)  # Update the progress bar
+            response = future.result()
+
+            # Check for a successful response and correct content type
+            if response is None or response.status_code != 200 or not response.headers.get(
+                "content-type", ""
+            ).startswith("text/html"):
+                # Mark the link as visited and log the reason for skipping
+                self.db_manager.mark_link_visited(url)
+                logger.info(
+                    "Skipping link %s due to invalid status code or content type", url
+                )
+                continue
 
-                # Mark the current link as visited in the database
+            # Parse the HTML once; metadata extraction, content extraction
+            # and link discovery all share this tree instead of each
+            # re-parsing the same bytes
+            tree = trafilatura.load_html(response.content)
+            if tree is None:
                 self.db_manager.mark_link_visited(url)
+                logger.warning("Could not parse HTML from %s", url)
+                continue
 
-        # Close the progress bar upon completion of the scraping process
-        pbar.close()
+            # Scrape the page for content and metadata
+            content, metadata = self.scrape_page(tree, url)
+
+            # Strip null metadata values here so exporters never have to
+            # re-filter what they parse out of the database
+            if metadata:
+                metadata = {k: v for k, v in metadata.items() if v is not None}
+
+            # Insert the scraped data and mark the link visited; the batch
+            # transaction opened by the caller commits everything at once
+            self.db_manager.insert_page(url, content, json.dumps(metadata))
+            self.db_manager.mark_link_visited(url)
+
+            # Fetch and insert new links found on the page, if not working from a predefined list
+            if not urls_list:
+                new_links = self.fetch_links(url=url, tree=tree)
+
+                # Queue only links never seen this session, then persist them
+                fresh_links = [u for u in new_links if u not in known_urls]
+                if fresh_links:
+                    known_urls.update(fresh_links)
+                    pending.extend(fresh_links)
+                    self.db_manager.insert_links_bulk(fresh_links)
+
+                    # Update the progress bar total with the count of new links
+                    pbar.total += len(fresh_links)
+                    pbar.refresh()
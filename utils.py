@@ -38,7 +38,7 @@ def url_to_filename(url):
         raise ValueError("URL must be a string")
 
     parsed_url = urlparse(url)
-    logger.debug(f"Parsing URL: {url}")  # Log the URL being parsed
+    logger.debug("Parsing URL: %s", url)  # Log the URL being parsed
 
     # Combine the network location and path, replacing slashes and periods with underscores
     base_filename = parsed_url.netloc + parsed_url.path
@@ -61,7 +61,7 @@ def url_dirname(url):
     str: The URL with the last path segment removed and ending with '/'.
     """
     parsed_url = urlparse(url)
-    logger.debug(f"Parsing URL: {url}")  # Add log message
+    logger.debug("Parsing URL: %s", url)  # Add log message
 
     # Extract the path segments and remove the last segment
     path_segments = parsed_url.path.rsplit("/", 1)[0]
@@ -96,7 +96,6 @@ def deduplicate_list(input_list):
     Returns:
     list: The deduplicated list.
     """
-    seen = set()
-    deduplicated_list = [x for x in input_list if not (x in seen or seen.add(x))]
-    return deduplicated_list
+    # dict.fromkeys preserves insertion order and dedups at C speed
+    return list(dict.fromkeys(input_list))
 